@@ -0,0 +1,44 @@
+from dataclasses import dataclass, fields
+
+import numpy as np
+
+
+@dataclass
+class BodyArrays:
+    # Structure-of-arrays body state: one contiguous column per quantity,
+    # indexed the same way as the SolarSystem's body list. The kinematic
+    # columns are float32, which is far more precision than the screen
+    # shows; mass and gm keep float64 for their magnitudes.
+    x: np.ndarray
+    y: np.ndarray
+    vx: np.ndarray
+    vy: np.ndarray
+    ax: np.ndarray
+    ay: np.ndarray
+    mass: np.ndarray
+    gm: np.ndarray  # G * mass, folded in once rather than per pair
+
+    @classmethod
+    def from_bodies(cls, bodies, G):
+        def column(values, dtype=np.float32):
+            return np.array(values, dtype=dtype)
+
+        mass = column([body.mass for body in bodies], np.float64)
+        return cls(
+            x=column([body.x for body in bodies]),
+            y=column([body.y for body in bodies]),
+            vx=column([body.x_vel for body in bodies]),
+            vy=column([body.y_vel for body in bodies]),
+            ax=np.zeros(len(bodies), dtype=np.float32),
+            ay=np.zeros(len(bodies), dtype=np.float32),
+            mass=mass,
+            gm=G * mass,
+        )
+
+    def permute(self, order):
+        # reorder every column so that body i becomes body order[i]
+        for field in fields(self):
+            setattr(self, field.name, getattr(self, field.name)[order])
+
+    def __len__(self):
+        return len(self.x)
@@ -1,6 +1,30 @@
-import math
+import numpy as np
 import pygame
 WIDTH, HEIGHT = 800, 800
+CENTER = np.array((WIDTH / 2, HEIGHT / 2))
+
+
+class _Column:
+    # A Planet attribute backed by its SolarSystem's BodyArrays once the
+    # planet belongs to one, and stored on the instance before that.
+    def __init__(self, column):
+        self.column = column
+
+    def __set_name__(self, owner, name):
+        self.local = "_" + name
+
+    def __get__(self, body, owner=None):
+        if body is None:
+            return self
+        if body._system is None:
+            return getattr(body, self.local)
+        return getattr(body._system.arrays, self.column)[body._index]
+
+    def __set__(self, body, value):
+        if body._system is None:
+            setattr(body, self.local, value)
+        else:
+            getattr(body._system.arrays, self.column)[body._index] = value
 
 
 class Planet:
@@ -8,74 +32,49 @@ class Planet:
     G = 6.67428e-11
     SCALE = 250 / AU  # 1AU = 100 pixels
     TIMESTEP = 3600*24  # 1 day
+    ORBIT_LENGTH = 1000  # points kept in the orbit trail
+
+    x = _Column("x")
+    y = _Column("y")
+    x_vel = _Column("vx")
+    y_vel = _Column("vy")
 
     def __init__(self, x, y, radius, color, mass):
+        # set by the SolarSystem this planet is added to
+        self._system = None
+        self._index = 0
+
         self.x = x
         self.y = y
         self.radius = radius
         self.color = color
         self.mass = mass
 
-        self.orbit = []
         self.sun = False
-        self.distance_to_sun = 0
 
         self.x_vel = 0
         self.y_vel = 0
 
-    def draw(self, win):
-        x = self.x * self.SCALE + WIDTH / 2
-        y = self.y * self.SCALE + HEIGHT / 2
-
-        if len(self.orbit) > 2:
-            updated_points = []
-            for point in self.orbit:
-                x, y = point
-                x = x * self.SCALE + WIDTH / 2
-                y = y * self.SCALE + HEIGHT / 2
-                updated_points.append((x, y))
-
-            pygame.draw.lines(win, self.color, False, updated_points, 2)
-
-        pygame.draw.circle(win, self.color, (x, y), self.radius)
-
-        # if not self.sun:
-        #     distance_text = FONT.render(
-        #         f"{round(self.distance_to_sun/1000, 1)}km", 1, WHITE)
-        #     win.blit(distance_text, (x - distance_text.get_width() /
-        #              2, y - distance_text.get_height()/2))
-
-    def attraction(self, other):
-        other_x, other_y = other.x, other.y
-        distance_x = other_x - self.x
-        distance_y = other_y - self.y
-        distance = math.sqrt(distance_x ** 2 + distance_y ** 2)
-
-        if other.sun:
-            self.distance_to_sun = distance
-
-        force = self.G * self.mass * other.mass / distance**2
-        theta = math.atan2(distance_y, distance_x)
-        force_x = math.cos(theta) * force
-        force_y = math.sin(theta) * force
-        return force_x, force_y
-
-    def update_position(self, planets):
-        total_fx = total_fy = 0
-        for planet in planets:
-            if self == planet:
-                continue
-
-            fx, fy = self.attraction(planet)
-            total_fx += fx
-            total_fy += fy
-
-        self.x_vel += total_fx / self.mass * self.TIMESTEP
-        self.y_vel += total_fy / self.mass * self.TIMESTEP
-
-        self.x += self.x_vel * self.TIMESTEP
-        self.y += self.y_vel * self.TIMESTEP
-        self.orbit.append((self.x, self.y))
+    @property
+    def distance_to_sun(self):
+        # computed from the current positions when read, not tracked per step
+        if self._system is None:
+            return 0.0
+        return self._system.distance_to_sun(self._index)
+
+    def draw_orbit(self, win, orbit):
+        # orbit is this body's trail in metres, oldest point first, as taken
+        # by SolarSystem.snapshot(); returns the rects that were drawn to
+        rects = []
+        if len(orbit) > 2:
+            # rounded like the body positions, so trails meet their discs
+            updated_points = np.rint(orbit * self.SCALE + CENTER).astype(np.int32)
+            # consecutive points often land on the same pixel; drop the repeats
+            moved = np.any(updated_points[1:] != updated_points[:-1], axis=1)
+            updated_points = updated_points[np.concatenate(([True], moved))]
+            if len(updated_points) > 1:
+                rects.append(pygame.draw.lines(win, self.color, False, updated_points.tolist(), 2))
+        return rects
 
 
 class Earth(Planet):
@@ -0,0 +1,172 @@
+import numpy as np
+
+MORTON_BITS = 16  # grid resolution per axis; also the maximum tree depth
+LEAF_SIZE = 8  # cells with at most this many bodies are not split further
+GROUP_SIZE = 16  # neighbouring bodies that share one interaction list
+
+
+def _spread_bits(v):
+    # insert a zero bit between each of the low 16 bits of v
+    v = (v | (v << 8)) & 0x00FF00FF
+    v = (v | (v << 4)) & 0x0F0F0F0F
+    v = (v | (v << 2)) & 0x33333333
+    v = (v | (v << 1)) & 0x55555555
+    return v
+
+
+def bounding_square(x, y):
+    x_min = x.min()
+    y_min = y.min()
+    width = max(x.max() - x_min, y.max() - y_min) * 1.0001 or 1.0
+    return x_min, y_min, width
+
+
+def morton_codes(x, y, x_min, y_min, width):
+    # Z-order codes on a 2**MORTON_BITS grid over the given square
+    scale = ((1 << MORTON_BITS) - 1) / width
+    ix = ((x - x_min) * scale).astype(np.uint32)
+    iy = ((y - y_min) * scale).astype(np.uint32)
+    return _spread_bits(ix) | (_spread_bits(iy) << 1)
+
+
+class QuadTree:
+    # Flat-array quadtree over the Morton-sorted bodies. Every cell covers a
+    # contiguous run of sorted bodies, start[k]:end[k], so the tree is built
+    # top-down by bisecting code ranges rather than by inserting bodies.
+    def __init__(self, x, y, mass):
+        x_min, y_min, width = bounding_square(x, y)
+        codes = morton_codes(x, y, x_min, y_min, width)
+        self.order = np.argsort(codes, kind="stable")
+        codes = codes[self.order]
+        self.x = x[self.order]
+        self.y = y[self.order]
+        self.mass = mass[self.order]
+
+        start, end, level, parent, children = [0], [len(codes)], [0], [-1], [[]]
+        corner_x, corner_y = [x_min], [y_min]
+        stack = [0]
+        while stack:
+            k = stack.pop()
+            s, e, depth = start[k], end[k], level[k]
+            if e - s <= LEAF_SIZE or depth == MORTON_BITS:
+                continue
+            half = width / 2.0 ** (depth + 1)
+
+            shift = 2 * (MORTON_BITS - depth - 1)
+            prefix = int(codes[s]) >> (shift + 2)
+            splits = np.array([((prefix << 2) + c) << shift for c in (1, 2, 3)], dtype=np.uint32)
+            edges = [s, *(np.searchsorted(codes[s:e], splits) + s).tolist(), e]
+            for c in range(4):
+                if edges[c] < edges[c + 1]:
+                    # the low bit of each Morton digit is x, the high bit y
+                    children[k].append(len(start))
+                    stack.append(len(start))
+                    start.append(edges[c])
+                    end.append(edges[c + 1])
+                    level.append(depth + 1)
+                    parent.append(k)
+                    children.append([])
+                    corner_x.append(corner_x[k] + (c & 1) * half)
+                    corner_y.append(corner_y[k] + (c >> 1) * half)
+
+        self.start = np.array(start)
+        self.end = np.array(end)
+        self.level = np.array(level)
+        self.parent = np.array(parent)
+        self.children = children
+        self.corner_x = np.array(corner_x)
+        self.corner_y = np.array(corner_y)
+        self.width = width / 2.0 ** self.level
+        self._compute_mass()
+
+    def _compute_mass(self):
+        # bottom-up: leaves sum their bodies, then each level adds into
+        # its parents, deepest first
+        n_nodes = len(self.start)
+        leaves = np.array([not c for c in self.children])
+        node_mass = np.zeros(n_nodes)
+        node_mx = np.zeros(n_nodes)
+        node_my = np.zeros(n_nodes)
+
+        mx = self.mass * self.x
+        my = self.mass * self.y
+        for k in np.flatnonzero(leaves):
+            s, e = self.start[k], self.end[k]
+            node_mass[k] = self.mass[s:e].sum()
+            node_mx[k] = mx[s:e].sum()
+            node_my[k] = my[s:e].sum()
+
+        for depth in range(self.level.max(), 0, -1):
+            nodes = np.flatnonzero(self.level == depth)
+            np.add.at(node_mass, self.parent[nodes], node_mass[nodes])
+            np.add.at(node_mx, self.parent[nodes], node_mx[nodes])
+            np.add.at(node_my, self.parent[nodes], node_my[nodes])
+
+        self.node_mass = node_mass
+        self.com_x = np.divide(node_mx, node_mass, out=np.zeros(n_nodes), where=node_mass > 0)
+        self.com_y = np.divide(node_my, node_mass, out=np.zeros(n_nodes), where=node_mass > 0)
+
+    def accelerations(self, theta, eps2):
+        # Accelerations in the caller's body order. The factor G is not
+        # applied here: build the tree from G * mass to get m/s^2 directly.
+        # eps2 must be positive: a group's own bodies are in its direct list
+        # and rely on the softening to contribute zero.
+        n = len(self.x)
+        ax = np.empty(n)
+        ay = np.empty(n)
+
+        # plain lists are much cheaper to index from the Python walk
+        children = self.children
+        start = self.start.tolist()
+        end = self.end.tolist()
+        width = self.width.tolist()
+        corner_x = self.corner_x.tolist()
+        corner_y = self.corner_y.tolist()
+        com_x = self.com_x.tolist()
+        com_y = self.com_y.tolist()
+        node_mass = self.node_mass.tolist()
+        theta_sq = theta * theta
+
+        for g0 in range(0, n, GROUP_SIZE):
+            g1 = min(g0 + GROUP_SIZE, n)
+            gx = self.x[g0:g1]
+            gy = self.y[g0:g1]
+            x_lo, x_hi = float(gx.min()), float(gx.max())
+            y_lo, y_hi = float(gy.min()), float(gy.max())
+
+            # One walk per group. A cell is accepted for the whole group when
+            # its width is under theta times the gap between the cell's square
+            # and the group's bounding box.
+            cell_x, cell_y, cell_m, direct = [], [], [], []
+            stack = [0]
+            while stack:
+                k = stack.pop()
+                w = width[k]
+                x0 = corner_x[k]
+                y0 = corner_y[k]
+                dx = max(x_lo - x0 - w, 0.0, x0 - x_hi)
+                dy = max(y_lo - y0 - w, 0.0, y0 - y_hi)
+                if w * w < theta_sq * (dx * dx + dy * dy):
+                    cell_x.append(com_x[k])
+                    cell_y.append(com_y[k])
+                    cell_m.append(node_mass[k])
+                elif children[k]:
+                    stack.extend(children[k])
+                else:
+                    direct.append(slice(start[k], end[k]))
+
+            lx = np.concatenate([cell_x] + [self.x[s] for s in direct])
+            ly = np.concatenate([cell_y] + [self.y[s] for s in direct])
+            lm = np.concatenate([cell_m] + [self.mass[s] for s in direct])
+
+            dx = lx[None, :] - gx[:, None]
+            dy = ly[None, :] - gy[:, None]
+            inv_r3 = (dx * dx + dy * dy + eps2) ** -1.5
+            ax[g0:g1] = (dx * inv_r3) @ lm
+            ay[g0:g1] = (dy * inv_r3) @ lm
+
+        out_ax = np.empty(n)
+        out_ay = np.empty(n)
+        out_ax[self.order] = ax
+        out_ay[self.order] = ay
+        return out_ax, out_ay
@@ -1,12 +1,11 @@
+import argparse
+import threading
+import time
 import pygame
 from planet_class import Sun, Earth, Mars, Mercury, Venus
-
-pygame.init()
+from solar_system import SolarSystem
 
 WIDTH, HEIGHT = 800, 800
-FONT = pygame.font.SysFont("comicsans", 16)
-WIN = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Planet Simulation")
 
 WHITE = (255, 255, 255)
 YELLOW = (255, 255, 0)
@@ -14,10 +13,50 @@ BLUE = (100, 149, 237)
 RED = (188, 39, 50)
 DARK_GREY = (80, 78, 81)
 
+PHYSICS_HZ = 60  # simulation steps per second, independent of the frame rate
+# Longest the physics thread holds the lock for in one go, so the render loop
+# never waits much more than this for its snapshot.
+PHYSICS_BATCH_SECONDS = 0.008
+
 
+def run_physics(system, lock, stop):
+    interval = 1 / PHYSICS_HZ
+    start = time.perf_counter()
+    done = 0
+    step_seconds = 0.0  # measured cost of one step
+    while not stop.is_set():
+        # if the thread fell behind, the steps owed go in one call, up to
+        # what fits in PHYSICS_BATCH_SECONDS
+        due = int((time.perf_counter() - start) / interval) + 1 - done
+        if due > 0:
+            if step_seconds > 0:
+                batch = max(1, min(due, int(PHYSICS_BATCH_SECONDS / step_seconds)))
+            else:
+                batch = 1
+            with lock:
+                t = time.perf_counter()
+                system.step(batch)
+                step_seconds = (time.perf_counter() - t) / batch
+            # steps that cannot be caught up within one batch are dropped, so
+            # an overloaded simulation runs slower instead of piling up debt
+            done += due
+        # always give the render loop a chance at the lock between batches
+        stop.wait(max(0.001, start + done * interval - time.perf_counter()))
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Planet Simulation")
+    parser.add_argument("--device", choices=("cpu", "cuda"), default="cpu",
+                        help="run the gravity kernel on the GPU for large body counts")
+    args = parser.parse_args()
+
+    pygame.init()
+    win = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("Planet Simulation")
+    # the frames only present what changed, so start from a fully presented one
+    win.fill((0, 0, 0))
+    pygame.display.flip()
+
     run = True
     clock = pygame.time.Clock()
 
@@ -29,22 +68,50 @@ def main():
     sun.sun = True
     
     planets = [sun, earth, mars, mercury, venus]
+    system = SolarSystem(planets, device=args.device)
+    dirty_rects = []
+
+    # QUIT and window exposure are the only events handled, so keep
+    # everything else (mouse motion in particular) out of the queue instead
+    # of draining it every frame
+    pygame.event.set_blocked(None)
+    pygame.event.set_allowed((pygame.QUIT, pygame.WINDOWEXPOSED))
+
+    # physics runs on its own thread; the render loop only takes snapshots
+    lock = threading.Lock()
+    stop = threading.Event()
+    physics = threading.Thread(target=run_physics, args=(system, lock, stop), daemon=True)
+    physics.start()
 
     while run:
         clock.tick(60)
-        WIN.fill((0, 0, 0))
+        # only the areas drawn last frame need clearing
+        for rect in dirty_rects:
+            win.fill((0, 0, 0), rect)
 
+        exposed = False
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 run = False
+            elif event.type == pygame.WINDOWEXPOSED:
+                exposed = True
 
-        for planet in planets:
-            planet.update_position(planets)
-            planet.draw(WIN)
+        with lock:
+            snapshot = system.snapshot()
+        drawn_rects = system.draw(win, snapshot)
 
-        pygame.display.update()
+        # present only what was cleared or drawn this frame, unless the
+        # window was uncovered and needs repainting as a whole
+        if exposed:
+            pygame.display.flip()
+        else:
+            pygame.display.update(dirty_rects + drawn_rects)
+        dirty_rects = drawn_rects
 
+    stop.set()
+    physics.join()
     pygame.quit()
 
 
-main()
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,8 @@
 import pygame
 import math
-pygame.init()
+from collections import deque
 
 WIDTH, HEIGHT = 800, 800
-WIN = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Planet Simulation")
 
 WHITE = (255, 255, 255)
 YELLOW = (255, 255, 0)
@@ -12,7 +10,19 @@ BLUE = (100, 149, 237)
 RED = (188, 39, 50)
 DARK_GREY = (80, 78, 81)
 
-FONT = pygame.font.SysFont("comicsans", 16)
+LABEL_REFRESH_MS = 500  # distance labels are re-rendered at most this often
+
+# created by init_display() rather than at import
+WIN = FONT = KM_TEXT = None
+
+
+def init_display():
+    global WIN, FONT, KM_TEXT
+    pygame.init()
+    WIN = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("Planet Simulation")
+    FONT = pygame.font.SysFont("comicsans", 16)
+    KM_TEXT = FONT.render("km", 1, WHITE).convert_alpha()  # static unit, rendered once
 
 
 class Planet:
@@ -20,6 +30,12 @@ class Planet:
     G = 6.67428e-11
     SCALE = 250 / AU  # 1AU = 100 pixels
     TIMESTEP = 3600*24  # 1 day
+    ORBIT_LENGTH = 1000  # points kept in the orbit trail
+
+    # fixed attribute layout: no per-instance __dict__ on the hot path
+    __slots__ = ("x", "y", "radius", "color", "mass", "_Gm", "orbit", "sun",
+                 "distance_to_sun", "_distance_text", "_distance_text_time",
+                 "x_vel", "y_vel")
 
     def __init__(self, x, y, radius, color, mass):
         self.x = x
@@ -27,70 +43,81 @@ class Planet:
         self.radius = radius
         self.color = color
         self.mass = mass
+        self._Gm = self.G * mass
 
-        self.orbit = []
+        self.orbit = deque(maxlen=self.ORBIT_LENGTH)
         self.sun = False
         self.distance_to_sun = 0
+        self._distance_text = None
+        self._distance_text_time = 0
 
         self.x_vel = 0
         self.y_vel = 0
 
     def draw(self, win):
-        x = self.x * self.SCALE + WIDTH / 2
-        y = self.y * self.SCALE + HEIGHT / 2
+        scale = self.SCALE
+        half_width = WIDTH / 2
+        half_height = HEIGHT / 2
+        x = self.x * scale + half_width
+        y = self.y * scale + half_height
 
         if len(self.orbit) > 2:
-            updated_points = []
-            for point in self.orbit:
-                x, y = point
-                x = x * self.SCALE + WIDTH / 2
-                y = y * self.SCALE + HEIGHT / 2
-                updated_points.append((x, y))
+            updated_points = [(px * scale + half_width, py * scale + half_height)
+                              for px, py in self.orbit]
 
             pygame.draw.lines(win, self.color, False, updated_points, 2)
 
         pygame.draw.circle(win, self.color, (x, y), self.radius)
 
         if not self.sun:
-            distance_text = FONT.render(
-                f"{round(self.distance_to_sun/1000, 1)}km", 1, WHITE)
-            win.blit(distance_text, (x - distance_text.get_width() /
-                     2, y - distance_text.get_height()/2))
-
-    def attraction(self, other):
-        other_x, other_y = other.x, other.y
-        distance_x = other_x - self.x
-        distance_y = other_y - self.y
-        distance = math.sqrt(distance_x ** 2 + distance_y ** 2)
+            now = pygame.time.get_ticks()
+            if self._distance_text is None or now - self._distance_text_time >= LABEL_REFRESH_MS:
+                self._distance_text = FONT.render(
+                    f"{round(self.distance_to_sun/1000, 1)}", 1, WHITE).convert_alpha()
+                self._distance_text_time = now
+            distance_text = self._distance_text
+            text_x = x - (distance_text.get_width() + KM_TEXT.get_width()) / 2
+            text_y = y - distance_text.get_height()/2
+            win.blit(distance_text, (text_x, text_y))
+            win.blit(KM_TEXT, (text_x + distance_text.get_width(), text_y))
+
+    def attraction(self, other, _sqrt=math.sqrt):
+        distance_x = other.x - self.x
+        distance_y = other.y - self.y
+        distance = _sqrt(distance_x * distance_x + distance_y * distance_y)
 
         if other.sun:
             self.distance_to_sun = distance
 
-        force = self.G * self.mass * other.mass / distance**2
-        theta = math.atan2(distance_y, distance_x)
-        force_x = math.cos(theta) * force
-        force_y = math.sin(theta) * force
+        # cos(theta) = dx / r and sin(theta) = dy / r, so no trig is needed
+        inv_r3 = 1.0 / (distance * distance * distance)
+        force = self.mass * other._Gm * inv_r3
+        force_x = force * distance_x
+        force_y = force * distance_y
         return force_x, force_y
 
     def update_position(self, planets):
+        attraction = self.attraction
         total_fx = total_fy = 0
         for planet in planets:
-            if self == planet:
+            if self is planet:
                 continue
 
-            fx, fy = self.attraction(planet)
+            fx, fy = attraction(planet)
             total_fx += fx
             total_fy += fy
 
-        self.x_vel += total_fx / self.mass * self.TIMESTEP
-        self.y_vel += total_fy / self.mass * self.TIMESTEP
+        timestep = self.TIMESTEP
+        self.x_vel += total_fx / self.mass * timestep
+        self.y_vel += total_fy / self.mass * timestep
 
-        self.x += self.x_vel * self.TIMESTEP
-        self.y += self.y_vel * self.TIMESTEP
+        self.x += self.x_vel * timestep
+        self.y += self.y_vel * timestep
         self.orbit.append((self.x, self.y))
 
 
 def main():
+    init_display()
     run = True
     clock = pygame.time.Clock()
 
@@ -128,4 +155,5 @@ def main():
     pygame.quit()
 
 
-main()
+if __name__ == "__main__":
+    main()
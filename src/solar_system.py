@@ -0,0 +1,228 @@
+import math
+import numpy as np
+import pygame
+import pygame.gfxdraw
+import quadtree
+from body_arrays import BodyArrays
+from planet_class import Planet, CENTER, WIDTH, HEIGHT
+from kernel import CUDA_AVAILABLE, NUMBA_AVAILABLE
+
+if NUMBA_AVAILABLE:
+    from kernel import cuda_accelerations, fixed_steps, nbody_accelerations, nbody_step
+
+# The tree walk is driven from Python, so it only beats the direct sum once
+# O(N log N) outweighs the interpreter cost: around 2k bodies against the
+# NumPy sum, but only around 32k against the compiled Numba kernel.
+BARNES_HUT_THRESHOLD = 32768 if NUMBA_AVAILABLE else 2048
+BARNES_HUT_THETA = 0.5
+
+# With the tree walk on, bodies are re-sorted into Morton order this often,
+# so spatial neighbours stay neighbours in memory for the tree build and walk.
+MORTON_SORT_INTERVAL = 16
+
+# With device="cuda", the GPU direct sum is used from this many bodies up;
+# below it, transfer and launch overhead outweigh the work.
+CUDA_THRESHOLD = 1024
+
+# Plummer softening length. It keeps r^2 non-zero, so self-terms (where
+# dx = dy = 0) drop out of the sums without any masking or branches.
+SOFTENING = 1e-3 * Planet.AU
+SOFTENING_SQ = SOFTENING * SOFTENING
+
+# The direct-sum force terms are evaluated in float32 with lengths in AU,
+# which keeps r^2 and r^-3 well inside float32 range.
+FORCE_UNIT = Planet.AU
+FORCE_SOFTENING_SQ = np.float32(SOFTENING_SQ / FORCE_UNIT**2)
+
+
+class SolarSystem:
+    # Body state lives in contiguous arrays; each Planet reads its state live
+    # from self.arrays by index, so nothing is copied per step. A Morton
+    # re-sort swaps the arrays and reassigns the indices, so Planet reads and
+    # distance_to_sun must hold the same lock as step().
+    def __init__(self, bodies, device="cpu", use_barnes_hut=None):
+        # use_barnes_hut=None picks the tree walk from BARNES_HUT_THRESHOLD
+        # bodies up; True or False forces it on or off
+        if device not in ("cpu", "cuda"):
+            raise ValueError(f"unknown device {device!r}")
+        if device == "cuda" and not CUDA_AVAILABLE:
+            raise RuntimeError("device='cuda' needs numba with a CUDA-capable GPU")
+
+        self.bodies = bodies
+        self.arrays = BodyArrays.from_bodies(bodies, Planet.G)
+        self._bind_bodies()
+        # drawing attributes as plain tuples, in the same order as the arrays
+        self._radii = np.array([int(body.radius) for body in bodies])
+        self._colors = tuple(body.color for body in bodies)
+        self._sun_index = next((i for i, body in enumerate(bodies) if body.sun), None)
+        self._use_cuda = device == "cuda" and len(bodies) >= CUDA_THRESHOLD
+        if use_barnes_hut is None:
+            use_barnes_hut = len(bodies) >= BARNES_HUT_THRESHOLD
+        self.use_barnes_hut = use_barnes_hut and not self._use_cuda
+        self._use_kernel = NUMBA_AVAILABLE and not (self._use_cuda or self.use_barnes_hut)
+        if self._use_kernel:
+            # a kernel specialized for this exact body count, if there is one
+            self._step_kernel = fixed_steps.get(len(bodies), nbody_step)
+        self._steps_since_sort = 0
+
+        # One ring buffer of trail points for all bodies, filled in a single
+        # write per step() call. Trails are sampled per call, not per
+        # timestep: a batched step(n) adds one point for its n steps.
+        self.trail = np.empty((len(bodies), Planet.ORBIT_LENGTH, 2), dtype=np.float32)
+        self._trail_n = 0
+
+        # velocity Verlet carries the acceleration over from the previous step
+        a = self.arrays
+        if self._use_kernel:
+            nbody_accelerations(a.x, a.y, a.gm, FORCE_SOFTENING_SQ, FORCE_UNIT, a.ax, a.ay)
+        else:
+            a.ax[:], a.ay[:] = self._accelerations()
+
+        self._update_screen_positions()
+
+    def accelerations(self):
+        x, y, gm = self.arrays.x, self.arrays.y, self.arrays.gm
+        dx = (x[None, :] - x[:, None]) / np.float32(FORCE_UNIT)
+        dy = (y[None, :] - y[:, None]) / np.float32(FORCE_UNIT)
+
+        inv_r3 = (dx * dx + dy * dy + FORCE_SOFTENING_SQ) ** np.float32(-1.5)
+
+        # the float32 terms are promoted back to float64 by the mass reduction
+        scale = 1.0 / (FORCE_UNIT * FORCE_UNIT)
+        ax = scale * ((dx * inv_r3) @ gm)
+        ay = scale * ((dy * inv_r3) @ gm)
+        return ax, ay
+
+    def tree_accelerations(self, theta=BARNES_HUT_THETA):
+        a = self.arrays
+        # the tree sums gm like any other mass, so no G is applied afterwards
+        tree = quadtree.QuadTree(a.x, a.y, a.gm)
+        return tree.accelerations(theta, SOFTENING_SQ)
+
+    def step(self, steps=1):
+        # advances `steps` timesteps; the Numba path runs them all in one call
+        if self._use_kernel:
+            a = self.arrays
+            self._step_kernel(a.x, a.y, a.vx, a.vy, a.ax, a.ay, a.gm,
+                              np.float32(Planet.TIMESTEP), steps, FORCE_SOFTENING_SQ, FORCE_UNIT)
+        else:
+            self._integrate(steps)
+
+        self._record_trail()
+
+        self._steps_since_sort += steps
+        if self.use_barnes_hut and self._steps_since_sort >= MORTON_SORT_INTERVAL:
+            self.sort_bodies()
+        self._update_screen_positions()
+
+    def sort_bodies(self):
+        # Reorder bodies along the Z-order curve. Bodies move little between
+        # sorts, so this mostly keeps the tree's own sort and gathers cheap.
+        a = self.arrays
+        codes = quadtree.morton_codes(a.x, a.y, *quadtree.bounding_square(a.x, a.y))
+        order = np.argsort(codes, kind="stable")
+        self._steps_since_sort = 0
+        if np.all(order[1:] > order[:-1]):
+            return
+
+        a.permute(order)
+        self.trail = self.trail[order]
+        self.bodies = [self.bodies[i] for i in order]
+        self._bind_bodies()
+        self._radii = self._radii[order]
+        self._colors = tuple(self._colors[i] for i in order)
+        if self._sun_index is not None:
+            self._sun_index = int(np.flatnonzero(order == self._sun_index)[0])
+
+    def distance_to_sun(self, i):
+        if self._sun_index is None:
+            return 0.0
+        a = self.arrays
+        sun = self._sun_index
+        return math.hypot(a.x[i] - a.x[sun], a.y[i] - a.y[sun])
+
+    def snapshot(self):
+        # copies of everything draw() needs, so rendering can happen while
+        # another thread keeps stepping (which may also reorder the bodies)
+        visible = self._visible
+        return (self.bodies, self._screen_xy.tolist(), self._radii[visible].tolist(),
+                [self._colors[i] for i in visible], self._trail_view())
+
+    def draw(self, win, snapshot=None):
+        # returns the rects that were drawn to
+        bodies, positions, radii, colors, orbits = snapshot if snapshot is not None else self.snapshot()
+        rects = []
+        for body, orbit in zip(bodies, orbits):
+            rects.extend(body.draw_orbit(win, orbit))
+
+        # bodies go on top of every trail, in one pass over the prepared
+        # columns (on-screen bodies only)
+        filled_circle = pygame.gfxdraw.filled_circle
+        aacircle = pygame.gfxdraw.aacircle
+        Rect = pygame.Rect
+        for (x, y), r, color in zip(positions, radii, colors):
+            filled_circle(win, x, y, r, color)
+            aacircle(win, x, y, r, color)
+            rects.append(Rect(x - r, y - r, 2 * r + 1, 2 * r + 1))
+        return rects
+
+    def _update_screen_positions(self):
+        # all bodies are transformed to whole screen pixels in one pass per step
+        xy = np.rint(np.column_stack((self.arrays.x, self.arrays.y)) * Planet.SCALE + CENTER)
+        # Only bodies whose disc overlaps the window are drawn. gfxdraw takes
+        # 16-bit coordinates, so far-off bodies must not reach it.
+        r = self._radii
+        on_screen = ((xy[:, 0] + r >= 0) & (xy[:, 0] - r < WIDTH)
+                     & (xy[:, 1] + r >= 0) & (xy[:, 1] - r < HEIGHT))
+        self._visible = np.flatnonzero(on_screen)
+        self._screen_xy = xy[self._visible].astype(np.int32)
+
+    def _bind_bodies(self):
+        # the Planet objects read their state from the arrays, by index
+        for i, body in enumerate(self.bodies):
+            body._system = self
+            body._index = i
+
+    def _trail_view(self):
+        # a copy of every trail, oldest point first
+        length = Planet.ORBIT_LENGTH
+        if self._trail_n <= length:
+            return self.trail[:, :self._trail_n].copy()
+        return np.roll(self.trail, -(self._trail_n % length), axis=1)
+
+    def _accelerations(self):
+        if self._use_cuda:
+            a = self.arrays
+            return cuda_accelerations(a.x, a.y, a.gm, FORCE_SOFTENING_SQ, FORCE_UNIT)
+        if self.use_barnes_hut:
+            return self.tree_accelerations()
+        return self.accelerations()
+
+    def _integrate(self, steps):
+        # velocity Verlet (kick-drift-kick): same single force evaluation per
+        # step as Euler, but second order and symplectic. Between steps the
+        # two half kicks are merged into one full kick, as in nbody_step.
+        dt = Planet.TIMESTEP
+        half_dt = 0.5 * dt
+        kick = half_dt
+        a = self.arrays
+        for _ in range(steps):
+            a.vx += a.ax * kick
+            a.vy += a.ay * kick
+            a.x += a.vx * dt
+            a.y += a.vy * dt
+
+            # stored back into the float32 columns, whichever path computed them
+            a.ax[:], a.ay[:] = self._accelerations()
+            kick = dt
+
+        if steps > 0:
+            a.vx += a.ax * half_dt
+            a.vy += a.ay * half_dt
+
+    def _record_trail(self):
+        a = self.arrays
+        head = self._trail_n % Planet.ORBIT_LENGTH
+        self.trail[:, head, 0] = a.x
+        self.trail[:, head, 1] = a.y
+        self._trail_n += 1